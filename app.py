@@ -3,437 +3,607 @@
 
 import sqlite3
 import re
+import json
+import queue
+from contextlib import contextmanager
 import pandas as pd
 import streamlit as st
 from pathlib import Path
 
+from db_index import migrate, fts_phrase, tune, VIP_NAMES, GRAPH_MIN_WEIGHT, GRAPH_MAX_NODES
+
 DB_PATH = Path("./epstein_files/epstein.db")
 BASE_DIR = Path("./epstein_files")
+POOL_SIZE = 4
+# Strongest non-VIP edges drawn; past this the graph is an unreadable
+# hairball anyway. VIP edges are always drawn on top of these.
+MAX_EDGES = 2000
+
+# Drawn as the green diamond
+EPSTEIN_NAMES = frozenset({'jeffrey epstein', 'epstein', 'jeffrey'})
+
+
+def _make_conn():
+    # Readers open the file read-only; the only writer is the migrate
+    # connection in get_pool() (and the CLI scripts). Under WAL they never
+    # block on it. The app issues a fixed set of query strings; keep all of
+    # them prepared.
+    conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True,
+                           check_same_thread=False, cached_statements=256)
+    tune(conn)
+    return conn
 
 
 @st.cache_resource
-def get_db():
+def get_pool():
     if not DB_PATH.exists():
         st.error("Database not found. See README for setup instructions.")
         st.stop()
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-    conn.execute("PRAGMA journal_mode=WAL")
-    return conn
-
-
-def main():
-    st.set_page_config(page_title="Epstein Files DB", layout="wide")
-    conn = get_db()
-
-    # Header stats
-    total_files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
-    total_ents = conn.execute("SELECT COUNT(DISTINCT normalized) FROM entities WHERE entity_label='PERSON'").fetchone()[0]
-    cooccur_edges = conn.execute("SELECT COUNT(*) FROM entity_cooccurrence").fetchone()[0]
-
-    st.title("Epstein Files DB")
-    st.caption(f"{total_files:,} files | {total_ents:,} people identified | {cooccur_edges:,} relationship edges")
-
-    st.link_button(
-        "⬇ Download the database from GitHub Releases",
-        "https://github.com/LMSBAND/epstein-files-db/releases/tag/v1.0",
-        type="primary",
+    conn = sqlite3.connect(str(DB_PATH))
+    tune(conn)
+    with st.spinner("Checking search indexes (first run builds them, takes a few minutes)..."):
+        migrate(conn)
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
+    # A few connections so concurrent sessions don't queue on one handle
+    pool = queue.Queue(maxsize=POOL_SIZE)
+    for _ in range(POOL_SIZE):
+        pool.put(_make_conn())
+    return pool
+
+
+@contextmanager
+def borrow():
+    """Check a connection out of the pool. Don't nest: the pool is small."""
+    pool = get_pool()
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+
+# The DB is read-only from the app's side, so query results can be cached
+# across reruns.
+@st.cache_data(ttl="1h", max_entries=64)
+def load_overview_stats():
+    with borrow() as conn:
+        total_files, total_ents, cooccur_edges = conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM files),
+                (SELECT COUNT(*) FROM person_stats),
+                (SELECT COUNT(*) FROM entity_cooccurrence)
+        """).fetchone()
+    return {
+        "total_files": total_files,
+        "total_ents": total_ents,
+        "cooccur_edges": cooccur_edges,
+    }
+
+
+@st.cache_data(ttl="1h", max_entries=64)
+def load_person_stats(name):
+    with borrow() as conn:
+        stats = conn.execute("""
+            SELECT SUM(count), COUNT(DISTINCT file_id)
+            FROM entities WHERE normalized = ?
+        """, (name,)).fetchone()
+    return stats if stats[0] else (0, 0)
+
+
+@st.cache_data(ttl="1h", max_entries=64)
+def load_connections(name):
+    with borrow() as conn:
+        return pd.read_sql_query("""
+            SELECT
+                CASE WHEN entity_a = ? THEN entity_b ELSE entity_a END as Connected_To,
+                file_count as Shared_Files
+            FROM entity_cooccurrence
+            WHERE entity_a = ? OR entity_b = ?
+            ORDER BY file_count DESC
+            LIMIT 50
+        """, conn, params=[name, name, name])
+
+
+@st.cache_data(ttl="1h", max_entries=64)
+def load_person_files(name):
+    with borrow() as conn:
+        df = pd.read_sql_query("""
+            SELECT f.filename as File, f.dataset as DS, e.count as Mentions, f.rel_path as Path
+            FROM entities e JOIN files f ON f.id = e.file_id
+            WHERE e.normalized = ?
+            ORDER BY e.count DESC
+            LIMIT 100
+        """, conn, params=[name])
+    # A dozen distinct datasets: Arrow ships a category as a small dictionary
+    df['DS'] = df['DS'].astype('category')
+    return df
+
+
+_Q_PERSON_MATCHES_FTS = """
+    WITH hits AS (
+        SELECT normalized FROM person_stats_fts
+        WHERE person_stats_fts MATCH ?
+    )
+    SELECT ps.normalized as Name, ps.mentions as Mentions, ps.files as Files
+    FROM hits h JOIN person_stats ps ON ps.normalized = h.normalized
+    ORDER BY ps.files DESC LIMIT 20
+"""
+
+# Trigrams need 3+ chars; shorter input falls back to a scan
+_Q_PERSON_MATCHES_SCAN = """
+    SELECT normalized as Name, mentions as Mentions, files as Files
+    FROM person_stats WHERE instr(normalized, ?) > 0
+    ORDER BY files DESC LIMIT 20
+"""
+
+
+@st.cache_data(ttl="1h", max_entries=64)
+def load_person_matches(query_lower):
+    if len(query_lower) >= 3:
+        sql, param = _Q_PERSON_MATCHES_FTS, fts_phrase(query_lower)
+    else:
+        sql, param = _Q_PERSON_MATCHES_SCAN, query_lower
+    with borrow() as conn:
+        rows = conn.execute(sql, (param,)).fetchall()
+    # Three known columns: skip read_sql_query's per-column dtype inference
+    return pd.DataFrame.from_records(rows, columns=["Name", "Mentions", "Files"])
+
+
+# ~400 chars around the first hit of :hl (or the start of the doc), cut in
+# SQLite so the full extracted_text never crosses into Python
+_PERSON_DOC_SNIPPET = """
+    SELECT id, filename, dataset, rel_path,
+        CASE WHEN pos > 0
+            THEN trim(substr(txt, max(1, pos - 200), pos + length(:hl) + 200 - max(1, pos - 200)),
+                      ' ' || char(9, 10, 13))
+            ELSE substr(txt, 1, 400)
+        END
+    FROM (
+        SELECT f.id, f.filename, f.dataset, f.rel_path, tc.extracted_text as txt,
+            instr(lower(tc.extracted_text), :hl) as pos, d.ord
+        FROM ({docs}) d
+        JOIN files f ON f.id = d.file_id
+        JOIN text_cache tc ON tc.file_id = f.id
+    )
+    ORDER BY ord DESC
+"""
+
+
+_Q_PERSON_DOCS = _PERSON_DOC_SNIPPET.format(docs="""
+    SELECT file_id, count as ord FROM entities WHERE normalized = :a
+    ORDER BY count DESC LIMIT 50
+""")
+_Q_SHARED_DOCS = _PERSON_DOC_SNIPPET.format(docs="""
+    SELECT DISTINCT e1.file_id, 0 as ord FROM entities e1
+    JOIN entities e2 ON e1.file_id = e2.file_id
+    WHERE e1.normalized = :a AND e2.normalized = :b
+    LIMIT 50
+""")
+
+
+@st.cache_data(ttl="1h", max_entries=64)
+def load_person_docs(name, other, highlight):
+    """Docs mentioning `name` (and `other`, if given) with a snippet around `highlight`."""
+    sql = _Q_PERSON_DOCS if other is None else _Q_SHARED_DOCS
+    with borrow() as conn:
+        return conn.execute(sql, {"a": name, "b": other, "hl": highlight}).fetchall()
+
+
+@st.cache_data(ttl="1h", max_entries=16)
+def load_full_text(file_id):
+    with borrow() as conn:
+        row = conn.execute(
+            "SELECT extracted_text FROM text_cache WHERE file_id = ?", (file_id,)
+        ).fetchone()
+    return row[0] if row else ""
+
+
+# Graph / search queries issued from main(), kept as module-level
+# constants so every rerun hands sqlite3 the same statement text
+_Q_TOP_PEOPLE = """
+    SELECT normalized, mentions, files
+    FROM person_stats WHERE files >= ?
+    ORDER BY files DESC, normalized LIMIT ?
+"""
+
+_Q_VIP_PEOPLE = """
+    SELECT ps.normalized, ps.mentions, ps.files
+    FROM vip_names v JOIN person_stats ps ON ps.normalized = v.name
+"""
+
+# Everything above the threshold, plus VIP edges at any weight, limited to
+# edges whose ends are both graph nodes (:nodes is a JSON array of names).
+# graph_edges is entity_cooccurrence pre-trimmed to possible graph nodes.
+# Only the non-VIP edges are capped, so a VIP's weak links can't be cut and
+# drop them from the graph.
+_Q_GRAPH_EDGES = """
+    WITH nodes(name) AS (SELECT value FROM json_each(:nodes)),
+    edges AS (
+        SELECT entity_a, entity_b, file_count,
+               entity_a IN vip_names OR entity_b IN vip_names as vip
+        FROM graph_edges
+        WHERE entity_a IN nodes AND entity_b IN nodes
+    )
+    SELECT entity_a, entity_b, file_count FROM edges
+    WHERE vip AND file_count >= 1
+    UNION ALL
+    SELECT * FROM (
+        SELECT entity_a, entity_b, file_count FROM edges
+        WHERE NOT vip AND file_count >= :min_weight
+        ORDER BY file_count DESC
+        LIMIT :max_edges
     )
+    ORDER BY file_count DESC
+"""
+
+# Resolve MATCH in a CTE first so the planner can't drop the FTS index.
+# FTS only finds the rows; the context is the same ±200 characters around
+# the first case-insensitive hit as before FTS, with the hit in bold, cut
+# in SQLite so the full text never leaves the DB unless "Show full text"
+# is clicked. MATERIALIZED keeps `pos` from being recomputed (lowercasing
+# the whole text) for every reference once the subquery is flattened.
+_Q_FULL_TEXT_SEARCH = """
+    WITH hits AS (
+        SELECT rowid FROM text_cache_fts
+        WHERE text_cache_fts MATCH :q
+        LIMIT 200
+    ),
+    docs AS MATERIALIZED (
+        SELECT f.id, f.filename, f.dataset, f.rel_path, tc.extracted_text as txt,
+            instr(lower(tc.extracted_text), :hl) as pos
+        FROM hits h
+        JOIN files f ON f.id = h.rowid
+        JOIN text_cache tc ON tc.file_id = h.rowid
+    )
+    SELECT id, filename, dataset, rel_path,
+        CASE WHEN pos > 0
+            THEN substr(txt, max(1, pos - 200), pos - max(1, pos - 200))
+                 || '**' || substr(txt, pos, length(:hl)) || '**'
+                 || substr(txt, pos + length(:hl), 200)
+            ELSE substr(txt, 1, 400)
+        END
+    FROM docs
+"""
+
+
+def _node_attrs(name, mentions, files):
+    """pyvis node dict for one person: Epstein, VIP or everyone else."""
+    if name in EPSTEIN_NAMES:
+        color, size, shape = "#00ff41", 60, "diamond"
+    elif name in VIP_NAMES:
+        color, size, shape = "#f1c40f", max(25, min(8 + files * 2, 50)), "star"
+    else:
+        color, size, shape = "#e74c3c", min(8 + files * 2, 50), "dot"
+    # Same keys add_node() would set (font comes from Network's font_color)
+    return {"id": name, "label": name, "color": color, "size": size, "shape": shape,
+            "title": f"{name}\n{files} files, {mentions} mentions",
+            "font": {"color": "white"}}
+
+
+@st.cache_data(ttl="30m", max_entries=32)
+def build_graph_html(min_weight, max_nodes):
+    """Render the pyvis graph once per slider combination.
+
+    Returns (html, people in the graph, edge count, whether the non-VIP
+    edges hit MAX_EDGES).
+    """
+    from pyvis.network import Network
+
+    with borrow() as conn:
+        # Get top PERSON entities
+        top_entities = conn.execute(_Q_TOP_PEOPLE, (min_weight, max_nodes)).fetchall()
+
+        entity_set = {e[0] for e in top_entities}
+        entity_info = {e[0]: (e[1], e[2]) for e in top_entities}
+
+        # Force-add VIPs
+        vip_rows = conn.execute(_Q_VIP_PEOPLE).fetchall()
+        for row in vip_rows:
+            if row[0] not in entity_set:
+                entity_set.add(row[0])
+                entity_info[row[0]] = (row[1], row[2])
+
+        # Get edges between the nodes picked above
+        edges = conn.execute(_Q_GRAPH_EDGES, {
+            "nodes": json.dumps(sorted(entity_set)), "min_weight": min_weight,
+            "max_edges": MAX_EDGES,
+        }).fetchall()
+
+    net = Network(height="700px", width="100%", bgcolor="#0e1117", font_color="white")
+    net.barnes_hut(gravity=-3000, central_gravity=0.3, spring_length=200)
+
+    node_attrs = {name: _node_attrs(name, tot, files) for name, (tot, files) in entity_info.items()}
+    added = set()
+    nodes, links = [], []
+
+    for a, b, w in edges:
+        for node in (a, b):
+            if node not in added:
+                nodes.append(node_attrs[node])
+                added.add(node)
+        links.append({"from": a, "to": b, "value": w, "title": f"{w} shared files"})
+
+    # Load straight into pyvis's lists: add_node/add_edge rescan node_ids
+    # and every existing edge per call. Nodes are deduped by `added`, and
+    # entity_cooccurrence holds each pair once.
+    net.nodes.extend(nodes)
+    net.node_ids.extend(n["id"] for n in nodes)
+    net.node_map.update((n["id"], n) for n in nodes)
+    net.edges.extend(links)
+
+    # Same page save_graph would write, without the disk round trip
+    html = net.generate_html(notebook=False)
+
+    capped = sum(1 for a, b, _ in edges if a not in VIP_NAMES and b not in VIP_NAMES) >= MAX_EDGES
+    return html, sorted(added), len(edges), capped
+
+
+# Streamlit drops a widget's state at the end of any run that doesn't draw
+# it, and only the active view is drawn. So kept widgets run under "_<key>"
+# and mirror their value into a plain "<key>" that survives view switches.
+def _kept(key, default, options=None):
+    """Widget kwargs that restore `key`'s last value (if still an option)."""
+    value = st.session_state.get(key, default)
+    if options is not None and value not in options:
+        value = default
+    st.session_state[key] = st.session_state["_" + key] = value
+    return {"key": "_" + key, "on_change": _keep, "args": (key,)}
+
+
+def _keep(key):
+    st.session_state[key] = st.session_state["_" + key]
+
+
+def render_graph():
+    """Relationship graph + person detail panel."""
+    col_a, col_b = st.columns(2)
+    with col_a:
+        min_weight = st.slider("Minimum shared files", GRAPH_MIN_WEIGHT, 20,
+                               **_kept("graph_min_weight", 3))
+    with col_b:
+        max_nodes = st.slider("Max nodes", 20, GRAPH_MAX_NODES, **_kept("graph_max_nodes", 100))
+
+    people_in_graph = []
+    try:
+        html, people_in_graph, edge_count, capped = build_graph_html(min_weight, max_nodes)
+
+        caption = f"{len(people_in_graph)} nodes, {edge_count} edges"
+        if capped:
+            caption += f" (capped at the {MAX_EDGES:,} strongest non-VIP edges; every VIP edge is kept)"
+        st.caption(caption)
+        st.components.v1.html(html, height=720, scrolling=True)
 
-    tab_graph, tab_search, tab_method = st.tabs(["Relationship Graph", "Search", "Methodology / Unknowns"])
-
-    # ── TAB 1: RELATIONSHIP GRAPH ──
-    with tab_graph:
-        col_a, col_b = st.columns(2)
-        with col_a:
-            min_weight = st.slider("Minimum shared files", 2, 20, 3)
-        with col_b:
-            max_nodes = st.slider("Max nodes", 20, 300, 100)
-
-        graph_path = BASE_DIR / "output" / "entity_graph.html"
-
-        try:
-            from pyvis.network import Network
-
-            vip_names = {
-                'jeffrey epstein', 'ghislaine maxwell', 'donald trump',
-                'donald j. trump', 'bill clinton', 'prince andrew',
-                'alan dershowitz', 'les wexner', 'jean-luc brunel',
-                'virginia roberts', 'virginia giuffre',
-            }
-
-            # Get top PERSON entities
-            top_entities = conn.execute("""
-                SELECT normalized, entity_label, SUM(count) as total, COUNT(DISTINCT file_id) as files
-                FROM entities WHERE entity_label = 'PERSON'
-                GROUP BY normalized HAVING files >= ?
-                ORDER BY files DESC LIMIT ?
-            """, (min_weight, max_nodes)).fetchall()
-
-            entity_set = {e[0] for e in top_entities}
-            entity_info = {e[0]: (e[1], e[2], e[3]) for e in top_entities}
-
-            # Force-add VIPs
-            for vip in vip_names:
-                if vip not in entity_set:
-                    row = conn.execute("""
-                        SELECT normalized, entity_label, SUM(count), COUNT(DISTINCT file_id)
-                        FROM entities WHERE normalized = ?
-                        GROUP BY normalized
-                    """, (vip,)).fetchone()
-                    if row:
-                        entity_set.add(row[0])
-                        entity_info[row[0]] = (row[1], row[2], row[3])
-
-            # Get edges
-            edges = conn.execute("""
-                SELECT entity_a, entity_b, file_count
-                FROM entity_cooccurrence WHERE file_count >= ?
-                ORDER BY file_count DESC
-            """, (min_weight,)).fetchall()
-
-            # VIP edges at lower threshold
-            vip_list = list(vip_names)
-            vip_ph = ','.join(['?'] * len(vip_list))
-            vip_edges = conn.execute(f"""
-                SELECT entity_a, entity_b, file_count
-                FROM entity_cooccurrence
-                WHERE file_count >= 1
-                AND (entity_a IN ({vip_ph}) OR entity_b IN ({vip_ph}))
-                ORDER BY file_count DESC
-            """, vip_list + vip_list).fetchall()
-
-            all_edges = {(a, b): w for a, b, w in edges}
-            for a, b, w in vip_edges:
-                if (a, b) not in all_edges:
-                    all_edges[(a, b)] = w
-
-            net = Network(height="700px", width="100%", bgcolor="#0e1117", font_color="white")
-            net.barnes_hut(gravity=-3000, central_gravity=0.3, spring_length=200)
-
-            epstein_names = {'jeffrey epstein', 'epstein', 'jeffrey'}
-            added = set()
-            edge_count = 0
-
-            for (a, b), w in all_edges.items():
-                if a not in entity_set or b not in entity_set:
-                    continue
-                for node in (a, b):
-                    if node not in added:
-                        lt, tot, files = entity_info.get(node, ("PERSON", 1, 1))
-                        if lt != "PERSON":
-                            continue
-                        if node in epstein_names:
-                            color, size, shape = "#00ff41", 60, "diamond"
-                        elif node in vip_names:
-                            color = "#f1c40f"
-                            size = max(25, min(8 + files * 2, 50))
-                            shape = "star"
-                        else:
-                            color, size, shape = "#e74c3c", min(8 + files * 2, 50), "dot"
-                        net.add_node(node, label=node, color=color, size=size, shape=shape,
-                                     title=f"{node}\n{files} files, {tot} mentions")
-                        added.add(node)
-                if a in added and b in added:
-                    net.add_edge(a, b, value=w, title=f"{w} shared files")
-                    edge_count += 1
-
-            graph_path.parent.mkdir(parents=True, exist_ok=True)
-            net.save_graph(str(graph_path))
-
-            st.caption(f"{len(added)} nodes, {edge_count} edges")
-            with open(graph_path, 'r') as f:
-                st.components.v1.html(f.read(), height=720, scrolling=True)
-
-            st.markdown("""
-            **Legend:**
-            :green[**Green Diamond**] = Jeffrey Epstein  |
-            :orange[**Gold Star**] = Key figures (Trump, Clinton, Prince Andrew, Maxwell, Dershowitz, etc.)  |
-            :red[**Red Dot**] = Other people  |
-            **Line thickness** = number of shared files
-            """)
-
-        except ImportError:
-            st.error("pyvis not installed. Run: pip install pyvis")
-
-        # ── Entity Detail Panel ──
-        st.markdown("---")
-        st.subheader("Explore a Person")
-
-        # Build list of people in the graph for the selectbox
-        people_in_graph = sorted(added) if 'added' in dir() and added else []
-        if people_in_graph:
-            selected_person = st.selectbox("Select person from graph", [""] + people_in_graph)
-
-            if selected_person:
-                # Stats
-                stats = conn.execute("""
-                    SELECT SUM(count), COUNT(DISTINCT file_id)
-                    FROM entities WHERE normalized = ?
-                """, (selected_person,)).fetchone()
-                mentions, file_count = stats if stats[0] else (0, 0)
-
-                col1, col2 = st.columns(2)
-                col1.metric("Total mentions", f"{mentions:,}")
-                col2.metric("Files appeared in", f"{file_count:,}")
-
-                # Connections
-                st.subheader(f"Connections: {selected_person}")
-                df_connections = pd.read_sql_query("""
-                    SELECT
-                        CASE WHEN entity_a = ? THEN entity_b ELSE entity_a END as Connected_To,
-                        file_count as Shared_Files
-                    FROM entity_cooccurrence
-                    WHERE entity_a = ? OR entity_b = ?
-                    ORDER BY file_count DESC
-                    LIMIT 50
-                """, conn, params=[selected_person, selected_person, selected_person])
-
-                if not df_connections.empty:
-                    st.dataframe(df_connections, width='stretch', hide_index=True)
-                else:
-                    st.info("No co-occurrence connections found.")
-
-                # Files
-                st.subheader(f"Files mentioning {selected_person}")
-                df_files = pd.read_sql_query("""
-                    SELECT f.filename as File, f.dataset as DS, e.count as Mentions, f.rel_path as Path
-                    FROM entities e JOIN files f ON f.id = e.file_id
-                    WHERE e.normalized = ?
-                    ORDER BY e.count DESC
-                    LIMIT 100
-                """, conn, params=[selected_person])
-
-                if not df_files.empty:
-                    st.dataframe(df_files, width='stretch', hide_index=True, height=400)
-
-    # ── TAB 2: SEARCH ──
-    with tab_search:
-        search_mode = st.radio("Search mode", ["Person / Relationships", "Full-Text Search"], horizontal=True)
-
-        if search_mode == "Person / Relationships":
-            st.subheader("Search People & Relationships")
-            person_query = st.text_input("Person name", placeholder="e.g. donald trump, les wexner, virginia")
-
-            if person_query:
-                query_lower = person_query.lower().strip()
-
-                # Find matching entities
-                df_matches = pd.read_sql_query("""
-                    SELECT normalized as Name, SUM(count) as Mentions, COUNT(DISTINCT file_id) as Files
-                    FROM entities WHERE entity_label = 'PERSON' AND normalized LIKE ?
-                    GROUP BY normalized ORDER BY Files DESC LIMIT 20
-                """, conn, params=[f"%{query_lower}%"])
-
-                if df_matches.empty:
-                    st.warning(f"No person matching '{person_query}' found in entities.")
-                else:
-                    st.dataframe(df_matches, width='stretch', hide_index=True)
-
-                    # Pick the top match for relationship display
-                    top_match = df_matches.iloc[0]['Name']
-                    st.subheader(f"Relationships: {top_match}")
-
-                    df_rels = pd.read_sql_query("""
-                        SELECT
-                            CASE WHEN entity_a = ? THEN entity_b ELSE entity_a END as Connected_To,
-                            file_count as Shared_Files
-                        FROM entity_cooccurrence
-                        WHERE entity_a = ? OR entity_b = ?
-                        ORDER BY file_count DESC
-                        LIMIT 50
-                    """, conn, params=[top_match, top_match, top_match])
-
-                    if not df_rels.empty:
-                        # Pie chart of connections
-                        import plotly.express as px
-                        fig = px.pie(
-                            df_rels.head(20), values='Shared_Files', names='Connected_To',
-                            title=f"Top connections for {top_match}",
-                            hole=0.3,
-                        )
-                        fig.update_layout(
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            font_color='white',
-                            height=500,
-                        )
-                        fig.update_traces(textinfo='label+value')
-                        st.plotly_chart(fig, use_container_width=True)
-
-                        # Select a connection to drill into
-                        connection_names = df_rels['Connected_To'].tolist()
-                        selected_connection = st.selectbox(
-                            "Select a connection to see shared documents",
-                            ["(all files for " + top_match + ")"] + connection_names,
-                            key="connection_select"
-                        )
-
-                        if selected_connection.startswith("(all files"):
-                            # Show docs for just the searched person
-                            st.subheader(f"Documents mentioning {top_match}")
-                            file_rows = conn.execute("""
-                                SELECT f.id, f.filename, f.dataset, f.rel_path, tc.extracted_text
-                                FROM entities e
-                                JOIN files f ON f.id = e.file_id
-                                JOIN text_cache tc ON tc.file_id = f.id
-                                WHERE e.normalized = ?
-                                ORDER BY e.count DESC
-                                LIMIT 50
-                            """, (top_match,)).fetchall()
-                            search_highlight = query_lower
-                        else:
-                            # Show docs containing BOTH people
-                            st.subheader(f"Documents mentioning both {top_match} & {selected_connection}")
-                            file_rows = conn.execute("""
-                                SELECT DISTINCT f.id, f.filename, f.dataset, f.rel_path, tc.extracted_text
-                                FROM entities e1
-                                JOIN entities e2 ON e1.file_id = e2.file_id
-                                JOIN files f ON f.id = e1.file_id
-                                JOIN text_cache tc ON tc.file_id = f.id
-                                WHERE e1.normalized = ? AND e2.normalized = ?
-                                LIMIT 50
-                            """, (top_match, selected_connection)).fetchall()
-                            search_highlight = selected_connection
-
-                        st.caption(f"{len(file_rows)} documents found")
-                        for fid, fname, ds, rel_path, text in file_rows:
-                            idx = text.lower().find(search_highlight)
-                            if idx >= 0:
-                                start = max(0, idx - 200)
-                                end = min(len(text), idx + len(search_highlight) + 200)
-                                snippet = text[start:end].strip()
-                            else:
-                                snippet = text[:400]
-
-                            with st.expander(f"[DS{ds}] {fname} (ID: {fid})"):
-                                st.markdown(f"Path: `{rel_path}`")
-                                st.markdown(f"...{snippet}...")
-                                if st.button("Show full text", key=f"person_full_{fid}"):
-                                    st.text_area("Full text", text, height=500, key=f"person_text_{fid}")
+        st.markdown("""
+        **Legend:**
+        :green[**Green Diamond**] = Jeffrey Epstein  |
+        :orange[**Gold Star**] = Key figures (Trump, Clinton, Prince Andrew, Maxwell, Dershowitz, etc.)  |
+        :red[**Red Dot**] = Other people  |
+        **Line thickness** = number of shared files
+        """)
+
+    except ImportError:
+        st.error("pyvis not installed. Run: pip install pyvis")
+
+    # ── Entity Detail Panel ──
+    st.markdown("---")
+    st.subheader("Explore a Person")
+
+    if people_in_graph:
+        options = [""] + people_in_graph
+        selected_person = st.selectbox("Select person from graph", options,
+                                       **_kept("graph_person", "", options))
+
+        if selected_person:
+            # Stats
+            mentions, file_count = load_person_stats(selected_person)
+
+            col1, col2 = st.columns(2)
+            col1.metric("Total mentions", f"{mentions:,}")
+            col2.metric("Files appeared in", f"{file_count:,}")
+
+            # Connections
+            st.subheader(f"Connections: {selected_person}")
+            df_connections = load_connections(selected_person)
+
+            if not df_connections.empty:
+                st.dataframe(df_connections, width='stretch', hide_index=True)
+            else:
+                st.info("No co-occurrence connections found.")
+
+            # Files
+            st.subheader(f"Files mentioning {selected_person}")
+            df_files = load_person_files(selected_person)
+
+            if not df_files.empty:
+                st.dataframe(df_files, width='stretch', hide_index=True, height=400)
+
+
+def render_search():
+    """Person / relationship search and full-text search."""
+    modes = ["Person / Relationships", "Full-Text Search"]
+    search_mode = st.radio("Search mode", modes, horizontal=True, **_kept("search_mode", modes[0]))
+
+    if search_mode == "Person / Relationships":
+        st.subheader("Search People & Relationships")
+        person_query = st.text_input("Person name", placeholder="e.g. donald trump, les wexner, virginia",
+                                     **_kept("person_query", ""))
+
+        query_lower = person_query.lower().strip()
+
+        # One letter matches most of the table; wait for a second
+        if person_query and len(query_lower) < 2:
+            st.caption("Type at least 2 characters.")
+        elif person_query:
+            # Find matching entities
+            df_matches = load_person_matches(query_lower)
+
+            if df_matches.empty:
+                st.warning(f"No person matching '{person_query}' found in entities.")
+            else:
+                st.dataframe(df_matches, width='stretch', hide_index=True)
+
+                # Pick the top match for relationship display
+                top_match = df_matches.iloc[0]['Name']
+                st.subheader(f"Relationships: {top_match}")
+
+                df_rels = load_connections(top_match)
+
+                if not df_rels.empty:
+                    # Pie chart of connections
+                    import plotly.express as px
+                    fig = px.pie(
+                        df_rels.head(20), values='Shared_Files', names='Connected_To',
+                        title=f"Top connections for {top_match}",
+                        hole=0.3,
+                    )
+                    fig.update_layout(
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        font_color='white',
+                        height=500,
+                    )
+                    fig.update_traces(textinfo='label+value')
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    # Select a connection to drill into
+                    options = ["(all files for " + top_match + ")"] + df_rels['Connected_To'].tolist()
+                    selected_connection = st.selectbox(
+                        "Select a connection to see shared documents", options,
+                        **_kept("connection_select", options[0], options)
+                    )
+
+                    if selected_connection.startswith("(all files"):
+                        # Show docs for just the searched person
+                        st.subheader(f"Documents mentioning {top_match}")
+                        file_rows = load_person_docs(top_match, None, query_lower)
                     else:
-                        st.info("No co-occurrence relationships found.")
+                        # Show docs containing BOTH people
+                        st.subheader(f"Documents mentioning both {top_match} & {selected_connection}")
+                        file_rows = load_person_docs(top_match, selected_connection, selected_connection)
+
+                    st.caption(f"{len(file_rows)} documents found")
+                    for fid, fname, ds, rel_path, snippet in file_rows:
+                        with st.expander(f"[DS{ds}] {fname} (ID: {fid})"):
+                            st.markdown(f"Path: `{rel_path}`")
+                            st.markdown(f"...{snippet}...")
+                            if st.button("Show full text", key=f"person_full_{fid}"):
+                                st.text_area("Full text", load_full_text(fid), height=500, key=f"person_text_{fid}")
+                else:
+                    st.info("No co-occurrence relationships found.")
 
-        else:
-            st.subheader("Full-Text Search")
-            st.caption("Search across 146M+ characters of extracted text")
+    else:
+        st.subheader("Full-Text Search")
+        st.caption("Search across 146M+ characters of extracted text")
 
-            search_term = st.text_input("Search term (case-insensitive)")
+        search_term = st.text_input("Search term (case-insensitive)", **_kept("fts_input", ""))
 
-            if search_term and st.button("Search"):
+        if search_term and len(search_term) < 3:
+            st.warning("Search term must be at least 3 characters.")
+        elif search_term:
+            if st.button("Search"):
+                st.session_state["fts_term"] = search_term
+            # Keep results up across reruns so "Show full text" clicks work
+            if st.session_state.get("fts_term") == search_term:
                 status = st.status(f"Searching for '{search_term}'...", expanded=True)
                 results_area = st.container()
-
-                cursor = conn.execute("""
-                    SELECT f.id, f.filename, f.dataset, f.rel_path, tc.extracted_text
-                    FROM text_cache tc
-                    JOIN files f ON f.id = tc.file_id
-                    WHERE tc.extracted_text LIKE ?
-                    LIMIT 200
-                """, (f"%{search_term}%",))
-
-                hit_count = 0
-                results = []
-                while True:
-                    rows = cursor.fetchmany(10)
-                    if not rows:
-                        break
-                    results.extend(rows)
-                    hit_count += len(rows)
-                    status.update(label=f"Found {hit_count} files so far...")
+                show_full = None
+
+                with borrow() as conn:
+                    cursor = conn.execute(_Q_FULL_TEXT_SEARCH, {
+                        "q": fts_phrase(search_term), "hl": search_term.lower(),
+                    })
+
+                    # Render each batch as it arrives instead of after the last row
+                    hit_count = 0
+                    while True:
+                        rows = cursor.fetchmany(10)
+                        if not rows:
+                            break
+                        for fid, fname, ds, rel_path, ctx in rows:
+                            exp = results_area.expander(f"[DS{ds}] {fname} (ID: {fid})")
+                            exp.markdown(f"Path: `{rel_path}`")
+                            exp.markdown(f"...{ctx}...")
+                            if exp.button("Show full text", key=f"full_{fid}"):
+                                show_full = (exp, fid)
+                        hit_count += len(rows)
+                        status.update(label=f"Found {hit_count} files so far...")
 
                 status.update(label=f"Done — {hit_count} files found", state="complete", expanded=False)
 
-                for fid, fname, ds, rel_path, text in results:
-                    lower_text = text.lower()
-                    idx = lower_text.find(search_term.lower())
-                    if idx >= 0:
-                        start = max(0, idx - 200)
-                        end = min(len(text), idx + len(search_term) + 200)
-                        context = text[start:end]
-                        # Bold the match
-                        match_start = idx - start
-                        match_end = match_start + len(search_term)
-                        highlighted = (
-                            context[:match_start]
-                            + "**" + context[match_start:match_end] + "**"
-                            + context[match_end:]
-                        )
-                    else:
-                        highlighted = text[:400]
-
-                    with results_area.expander(f"[DS{ds}] {fname} (ID: {fid})"):
-                        st.markdown(f"Path: `{rel_path}`")
-                        st.markdown(f"...{highlighted}...")
-                        if st.button("Show full text", key=f"full_{fid}"):
-                            st.text_area("Full extracted text", text, height=500, key=f"text_{fid}")
+                # Fetched after the search connection is back in the pool
+                if show_full:
+                    exp, fid = show_full
+                    exp.text_area("Full extracted text", load_full_text(fid), height=500, key=f"text_{fid}")
 
 
-    # ── TAB 3: METHODOLOGY / UNKNOWNS ──
-    with tab_method:
-        st.subheader("Brute-Force Audit Methodology")
-        st.warning("**Disclaimer:** This was built quick and dirty. Some of the extracted text looks weird (OCR artifacts, encoding issues, etc.). Looking for help cleaning this up — PRs welcome on GitHub.\n\nThere are torrents circulating (check [r/DataHoarder](https://www.reddit.com/r/DataHoarder/)) that likely contain more complete collections of the Epstein files. If you have access to those, we'd welcome contributions to expand this database.")
-        st.markdown("""
+def render_methodology():
+    """Brute-force audit methodology (static content, no queries)."""
+    st.subheader("Brute-Force Audit Methodology")
+    st.warning("**Disclaimer:** This was built quick and dirty. Some of the extracted text looks weird (OCR artifacts, encoding issues, etc.). Looking for help cleaning this up — PRs welcome on GitHub.\n\nThere are torrents circulating (check [r/DataHoarder](https://www.reddit.com/r/DataHoarder/)) that likely contain more complete collections of the Epstein files. If you have access to those, we'd welcome contributions to expand this database.")
+    st.markdown("""
 On January 30, 2026, the DOJ announced the release of **3.5 million pages** of Epstein files
 under the Epstein Files Transparency Act. There is no manifest, no zip files for Datasets 8-11,
 and no way to verify completeness unless you brute-force every possible URL.
 
 **So that's exactly what we did.**
-        """)
+    """)
 
-        st.markdown("---")
-        st.subheader("How It Works")
-        st.markdown("""
+    st.markdown("---")
+    st.subheader("How It Works")
+    st.markdown("""
 - Python scraper hitting every possible EFTA file ID across Datasets 8-11
 - Every HTTP 200 response: download the PDF
 - Every HTTP 404: logged as an empty slot
 - Zero 403s across all runs = no rate limiting, these are **real gaps**
 - Age gate bypass: `justiceGovAgeVerified=true` cookie
 - ~40 requests/second sustained across parallel terminals
-        """)
-
-        st.markdown("---")
-        st.subheader("ID Ranges")
-        df_ranges = pd.DataFrame({
-            'Dataset': ['8', '9', '10', '11'],
-            'Start ID': ['EFTA00000001', 'EFTA00423793', 'EFTA01262782', 'EFTA02212883'],
-            'End ID': ['EFTA00423792', 'EFTA01262781', 'EFTA02212882', 'EFTA02730264'],
-            'Total Slots': ['423,792', '838,989', '950,101', '517,382'],
-        })
-        st.dataframe(df_ranges, width='stretch', hide_index=True)
-
-        st.markdown("---")
-        st.subheader("Brute-Force Results")
-
-        df_results = pd.DataFrame({
-            'Dataset': ['8', '9', '10', '11'],
-            'Files Found': ['In progress', '807', '686', '408'],
-            'Empty Slots (404)': ['In progress', '838,182', '895,514', '516,943'],
-            'Total IDs Scanned': ['In progress', '838,989', '896,200', '517,351'],
-            'Fill Rate': ['In progress', '0.096%', '0.077%', '0.079%'],
-            'Status': ['Running', 'Complete (log lost)', 'Complete', 'Complete'],
-        })
-        st.dataframe(df_results, width='stretch', hide_index=True)
-
-        st.markdown("---")
-        st.subheader("What This Means")
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Files Actually Found (DS 9-11)", "1,901")
-        col2.metric("Total Slots Scanned (DS 9-11)", "2,252,540")
-        col3.metric("Average Fill Rate", "0.084%")
-
-        st.markdown("""
+    """)
+
+    st.markdown("---")
+    st.subheader("ID Ranges")
+    df_ranges = pd.DataFrame({
+        'Dataset': ['8', '9', '10', '11'],
+        'Start ID': ['EFTA00000001', 'EFTA00423793', 'EFTA01262782', 'EFTA02212883'],
+        'End ID': ['EFTA00423792', 'EFTA01262781', 'EFTA02212882', 'EFTA02730264'],
+        'Total Slots': ['423,792', '838,989', '950,101', '517,382'],
+    })
+    st.dataframe(df_ranges, width='stretch', hide_index=True)
+
+    st.markdown("---")
+    st.subheader("Brute-Force Results")
+
+    df_results = pd.DataFrame({
+        'Dataset': ['8', '9', '10', '11'],
+        'Files Found': ['In progress', '807', '686', '408'],
+        'Empty Slots (404)': ['In progress', '838,182', '895,514', '516,943'],
+        'Total IDs Scanned': ['In progress', '838,989', '896,200', '517,351'],
+        'Fill Rate': ['In progress', '0.096%', '0.077%', '0.079%'],
+        'Status': ['Running', 'Complete (log lost)', 'Complete', 'Complete'],
+    })
+    st.dataframe(df_results, width='stretch', hide_index=True)
+
+    st.markdown("---")
+    st.subheader("What This Means")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Files Actually Found (DS 9-11)", "1,901")
+    col2.metric("Total Slots Scanned (DS 9-11)", "2,252,540")
+    col3.metric("Average Fill Rate", "0.084%")
+
+    st.markdown("""
 **99.92% of file slots are empty.** These aren't bad URLs — the pattern is consistent
 across all completed datasets. Same sparse distribution. Same fill rate to three decimal places.
 
 - **DOJ claimed:** 3.5 million pages
 - **Actual files found so far:** 1,901 across DS 9-11 (complete), DS 8 still running
 - **Projected total across DS 8-11:** ~1,900-2,000 files
-        """)
+    """)
 
-        st.markdown("---")
-        st.subheader("Unknowns & Open Questions")
-        st.markdown("""
+    st.markdown("---")
+    st.subheader("Unknowns & Open Questions")
+    st.markdown("""
 1. **No manifest exists** — Every legitimate data release has one. Why not this one?
 2. **Dataset 8 zip is a 0-byte file, now removed** — On Jan 31, the DOJ site listed a zip download for DS8 (`DataSet 8.zip`). It downloaded successfully but was **0 bytes**. By Feb 1, even the 0-byte file was removed — the link now returns "Access Denied" in browsers and 404 via direct request. DS 9-11 have no zip links at all. Only DS 1-7 and 12 have working bulk downloads.
 3. **Dataset 8 scan is running** — Re-started after terminal crash; results pending.
@@ -443,16 +613,52 @@ across all completed datasets. Same sparse distribution. Same fill rate to three
 6. **Fill rate is suspiciously uniform** — 0.077%, 0.079% across datasets. That's not random. Batch upload or batch deletion?
 7. **Browser blocked, scraper not** — Mid-audit, DOJ/Akamai blocked browser access to justice.gov/epstein,
    but the Python script kept running at 39 req/s. The audit finished while the auditor was banned from the website.
-        """)
+    """)
 
-        st.markdown("---")
-        st.subheader("Evidence Preservation")
-        st.markdown("""
+    st.markdown("---")
+    st.subheader("Evidence Preservation")
+    st.markdown("""
 - All downloaded files checksummed
 - 404 patterns logged with timestamps
 - Methodology documented and reproducible
 - Independent verification: Reddit datahoarders hitting the same 404 wall
-        """)
+    """)
+
+
+# Views, keyed by their ?tab= query param
+VIEWS = {
+    "graph": ("Relationship Graph", render_graph),
+    "search": ("Search", render_search),
+    "method": ("Methodology / Unknowns", render_methodology),
+}
+
+
+def main():
+    st.set_page_config(page_title="Epstein Files DB", layout="wide")
+
+    # Header stats
+    stats = load_overview_stats()
+
+    st.title("Epstein Files DB")
+    st.caption(f"{stats['total_files']:,} files | {stats['total_ents']:,} people identified | {stats['cooccur_edges']:,} relationship edges")
+
+    st.link_button(
+        "⬇ Download the database from GitHub Releases",
+        "https://github.com/LMSBAND/epstein-files-db/releases/tag/v1.0",
+        type="primary",
+    )
+
+    # st.tabs runs every tab body on each rerun; a selector renders (and
+    # queries) only the active view. ?tab= keeps it across reloads/links.
+    if "active_tab" not in st.session_state:
+        tab = st.query_params.get("tab", "graph")
+        st.session_state["active_tab"] = tab if tab in VIEWS else "graph"
+    active = st.radio(
+        "View", list(VIEWS), key="active_tab", horizontal=True,
+        format_func=lambda k: VIEWS[k][0], label_visibility="collapsed",
+    )
+    st.query_params["tab"] = active
+    VIEWS[active][1]()
 
 
 if __name__ == "__main__":
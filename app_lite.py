@@ -5,28 +5,143 @@ import sqlite3
 import pandas as pd
 import streamlit as st
 from pathlib import Path
-import tempfile
 
 DB_PATH = Path(__file__).parent / "epstein_lite.db"
 
+# Always shown in the graph (gold stars), even below the weight threshold
+VIP_NAMES = frozenset({
+    'jeffrey epstein', 'ghislaine maxwell', 'donald trump',
+    'donald j. trump', 'bill clinton', 'prince andrew',
+    'alan dershowitz', 'les wexner', 'jean-luc brunel',
+    'virginia roberts', 'virginia giuffre',
+})
+
+# Drawn as the green diamond
+EPSTEIN_NAMES = frozenset({'jeffrey epstein', 'epstein', 'jeffrey'})
+
 
 @st.cache_resource
 def get_db():
     if not DB_PATH.exists():
         st.error("epstein_lite.db not found.")
         st.stop()
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    # One handle for the life of the server. The lite DB ships with the repo
+    # and is never written: open it read-only + immutable so SQLite skips
+    # file locking and change checks, and map the whole (~30 MB) file.
+    conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro&immutable=1", uri=True,
+                           check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+def _node_attrs(name, mentions, files):
+    """pyvis node dict for one person: Epstein, VIP or everyone else."""
+    if name in EPSTEIN_NAMES:
+        color, size, shape = "#00ff41", 60, "diamond"
+    elif name in VIP_NAMES:
+        color, size, shape = "#f1c40f", max(25, min(8 + files * 2, 50)), "star"
+    else:
+        color, size, shape = "#e74c3c", min(8 + files * 2, 50), "dot"
+    # Same keys add_node() would set (font comes from Network's font_color)
+    return {"id": name, "label": name, "color": color, "size": size, "shape": shape,
+            "title": f"{name}\n{files} files, {mentions} mentions",
+            "font": {"color": "white"}}
 
-def main():
-    st.set_page_config(page_title="Epstein Files DB", layout="wide")
-    conn = get_db()
 
+# The lite DB is read-only, so header stats never change while it's up
+@st.cache_data(ttl="1h")
+def load_overview_stats():
+    conn = get_db()
     total_files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
     total_ents = conn.execute("SELECT COUNT(DISTINCT normalized) FROM entities").fetchone()[0]
     cooccur_edges = conn.execute("SELECT COUNT(*) FROM entity_cooccurrence").fetchone()[0]
+    return total_files, total_ents, cooccur_edges
+
+
+@st.cache_data(ttl="30m", max_entries=32)
+def build_graph_html(min_weight, max_nodes):
+    """Render the pyvis graph once per slider combination.
+
+    Returns (html, people in the graph, edge count).
+    """
+    from pyvis.network import Network
+
+    conn = get_db()
+
+    top_entities = conn.execute("""
+        SELECT normalized, entity_label, SUM(count) as total, COUNT(DISTINCT file_id) as files
+        FROM entities
+        GROUP BY normalized HAVING files >= ?
+        ORDER BY files DESC LIMIT ?
+    """, (min_weight, max_nodes)).fetchall()
+
+    entity_set = {e[0] for e in top_entities}
+    entity_info = {e[0]: (e[1], e[2], e[3]) for e in top_entities}
+
+    # Force-add VIPs
+    missing_vips = [v for v in VIP_NAMES if v not in entity_set]
+    if missing_vips:
+        missing_ph = ','.join(['?'] * len(missing_vips))
+        vip_rows = conn.execute(f"""
+            SELECT normalized, entity_label, SUM(count), COUNT(DISTINCT file_id)
+            FROM entities WHERE normalized IN ({missing_ph})
+            GROUP BY normalized
+        """, missing_vips).fetchall()
+        for row in vip_rows:
+            entity_set.add(row[0])
+            entity_info[row[0]] = (row[1], row[2], row[3])
+
+    # Get edges: everything above the threshold, plus VIP edges at any weight
+    vip_list = list(VIP_NAMES)
+    vip_ph = ','.join(['?'] * len(vip_list))
+    edges = conn.execute(f"""
+        SELECT entity_a, entity_b, file_count
+        FROM entity_cooccurrence
+        WHERE file_count >= ?
+           OR (file_count >= 1 AND (entity_a IN ({vip_ph}) OR entity_b IN ({vip_ph})))
+        ORDER BY file_count DESC
+    """, [min_weight] + vip_list + vip_list).fetchall()
+
+    all_edges = {}
+    for a, b, w in edges:
+        all_edges.setdefault((a, b), w)
+
+    net = Network(height="700px", width="100%", bgcolor="#0e1117", font_color="white")
+    net.barnes_hut(gravity=-3000, central_gravity=0.3, spring_length=200)
+
+    node_attrs = {name: _node_attrs(name, tot, files) for name, (lt, tot, files) in entity_info.items()}
+    added = set()
+    nodes, links = [], []
+
+    for (a, b), w in all_edges.items():
+        if a not in node_attrs or b not in node_attrs:
+            continue
+        for node in (a, b):
+            if node not in added:
+                nodes.append(node_attrs[node])
+                added.add(node)
+        links.append({"from": a, "to": b, "value": w, "title": f"{w} shared files"})
+
+    # Load straight into pyvis's lists: add_node/add_edge rescan node_ids
+    # and every existing edge per call. Nodes are deduped by `added`, and
+    # all_edges is keyed by pair.
+    net.nodes.extend(nodes)
+    net.node_ids.extend(n["id"] for n in nodes)
+    net.node_map.update((n["id"], n) for n in nodes)
+    net.edges.extend(links)
+    edge_count = len(links)
+
+    # Same page save_graph would write, without the disk round trip
+    html = net.generate_html(notebook=False)
+
+    return html, sorted(added), edge_count
+
+
+def main():
+    st.set_page_config(page_title="Epstein Files DB", layout="wide")
+    conn = get_db()
+
+    total_files, total_ents, cooccur_edges = load_overview_stats()
 
     st.title("Epstein Files DB")
     st.caption(f"{total_files:,} files | {total_ents:,} people identified | {cooccur_edges:,} relationship edges")
@@ -44,92 +159,12 @@ def main():
         with col_b:
             max_nodes = st.slider("Max nodes", 20, 300, 100)
 
+        people_in_graph = []
         try:
-            from pyvis.network import Network
-
-            vip_names = {
-                'jeffrey epstein', 'ghislaine maxwell', 'donald trump',
-                'donald j. trump', 'bill clinton', 'prince andrew',
-                'alan dershowitz', 'les wexner', 'jean-luc brunel',
-                'virginia roberts', 'virginia giuffre',
-            }
-
-            top_entities = conn.execute("""
-                SELECT normalized, entity_label, SUM(count) as total, COUNT(DISTINCT file_id) as files
-                FROM entities
-                GROUP BY normalized HAVING files >= ?
-                ORDER BY files DESC LIMIT ?
-            """, (min_weight, max_nodes)).fetchall()
-
-            entity_set = {e[0] for e in top_entities}
-            entity_info = {e[0]: (e[1], e[2], e[3]) for e in top_entities}
-
-            for vip in vip_names:
-                if vip not in entity_set:
-                    row = conn.execute("""
-                        SELECT normalized, entity_label, SUM(count), COUNT(DISTINCT file_id)
-                        FROM entities WHERE normalized = ?
-                        GROUP BY normalized
-                    """, (vip,)).fetchone()
-                    if row:
-                        entity_set.add(row[0])
-                        entity_info[row[0]] = (row[1], row[2], row[3])
-
-            edges = conn.execute("""
-                SELECT entity_a, entity_b, file_count
-                FROM entity_cooccurrence WHERE file_count >= ?
-                ORDER BY file_count DESC
-            """, (min_weight,)).fetchall()
-
-            vip_list = list(vip_names)
-            vip_ph = ','.join(['?'] * len(vip_list))
-            vip_edges = conn.execute(f"""
-                SELECT entity_a, entity_b, file_count
-                FROM entity_cooccurrence
-                WHERE file_count >= 1
-                AND (entity_a IN ({vip_ph}) OR entity_b IN ({vip_ph}))
-                ORDER BY file_count DESC
-            """, vip_list + vip_list).fetchall()
-
-            all_edges = {(a, b): w for a, b, w in edges}
-            for a, b, w in vip_edges:
-                if (a, b) not in all_edges:
-                    all_edges[(a, b)] = w
-
-            net = Network(height="700px", width="100%", bgcolor="#0e1117", font_color="white")
-            net.barnes_hut(gravity=-3000, central_gravity=0.3, spring_length=200)
-
-            epstein_names = {'jeffrey epstein', 'epstein', 'jeffrey'}
-            added = set()
-            edge_count = 0
-
-            for (a, b), w in all_edges.items():
-                if a not in entity_set or b not in entity_set:
-                    continue
-                for node in (a, b):
-                    if node not in added:
-                        lt, tot, files = entity_info.get(node, ("PERSON", 1, 1))
-                        if node in epstein_names:
-                            color, size, shape = "#00ff41", 60, "diamond"
-                        elif node in vip_names:
-                            color = "#f1c40f"
-                            size = max(25, min(8 + files * 2, 50))
-                            shape = "star"
-                        else:
-                            color, size, shape = "#e74c3c", min(8 + files * 2, 50), "dot"
-                        net.add_node(node, label=node, color=color, size=size, shape=shape,
-                                     title=f"{node}\n{files} files, {tot} mentions")
-                        added.add(node)
-                if a in added and b in added:
-                    net.add_edge(a, b, value=w, title=f"{w} shared files")
-                    edge_count += 1
-
-            graph_file = Path(tempfile.gettempdir()) / "entity_graph.html"
-            net.save_graph(str(graph_file))
-
-            st.caption(f"{len(added)} nodes, {edge_count} edges")
-            with open(graph_file, 'r') as f:
-                st.components.v1.html(f.read(), height=720, scrolling=True)
+            html, people_in_graph, edge_count = build_graph_html(min_weight, max_nodes)
+
+            st.caption(f"{len(people_in_graph)} nodes, {edge_count} edges")
+            st.components.v1.html(html, height=720, scrolling=True)
 
             st.markdown("""
             **Legend:**
@@ -146,7 +181,6 @@ def main():
         st.markdown("---")
         st.subheader("Explore a Person")
 
-        people_in_graph = sorted(added) if 'added' in dir() and added else []
         if people_in_graph:
             selected_person = st.selectbox("Select person from graph", [""] + people_in_graph)
 
@@ -194,14 +228,18 @@ def main():
         st.subheader("Search People & Relationships")
         person_query = st.text_input("Person name", placeholder="e.g. donald trump, les wexner, virginia")
 
-        if person_query:
-            query_lower = person_query.lower().strip()
+        query_lower = person_query.lower().strip()
 
-            df_matches = pd.read_sql_query("""
+        # One letter matches most of the table; wait for a second
+        if person_query and len(query_lower) < 2:
+            st.caption("Type at least 2 characters.")
+        elif person_query:
+            rows = conn.execute("""
                 SELECT normalized as Name, SUM(count) as Mentions, COUNT(DISTINCT file_id) as Files
-                FROM entities WHERE normalized LIKE ?
+                FROM entities WHERE instr(normalized, ?) > 0
                 GROUP BY normalized ORDER BY Files DESC LIMIT 20
-            """, conn, params=[f"%{query_lower}%"])
+            """, (query_lower,)).fetchall()
+            df_matches = pd.DataFrame.from_records(rows, columns=["Name", "Mentions", "Files"])
 
             if df_matches.empty:
                 st.warning(f"No person matching '{person_query}' found.")
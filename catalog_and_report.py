@@ -32,10 +32,33 @@ try:
 except ImportError:
     HAS_PYPDF = False
 
+from db_index import init_text_fts, init_indexes, table_exists, fts_phrase, tune
+
 BASE_DIR = Path("./epstein_files")
 DB_PATH = BASE_DIR / "epstein.db"
 OUTPUT_DIR = BASE_DIR / "output"
 
+# One statement text for every batch, so sqlite3's statement cache reuses
+# the prepared INSERT instead of re-parsing it. Upsert on (file_id, keyword):
+# rows whose count and context didn't change aren't rewritten.
+INSERT_RESULT_SQL = """
+    INSERT INTO search_results (file_id, keyword, match_count, context) VALUES (?, ?, ?, ?)
+    ON CONFLICT (file_id, keyword) DO UPDATE
+        SET match_count = excluded.match_count, context = excluded.context
+        WHERE match_count IS NOT excluded.match_count OR context IS NOT excluded.context
+"""
+
+# Composite indexes for this script's queries (see db_index.init_indexes):
+# report's per-keyword hits and search_results totals, and status's
+# per-dataset file counts.
+CATALOG_INDEXES = [
+    ("ix_sr_kw_cnt", "search_results", "keyword, match_count, file_id", None),
+    ("ix_files_dataset_flags", "files", "dataset, has_text, needs_ocr, file_size", None),
+]
+
+# Runs of whitespace, collapsed to one space in match contexts
+_WS_RE = re.compile(r'\s+')
+
 # All locations where PDFs live
 SCAN_DIRS = [
     # Extracted zips (DS 1-7, 12)
@@ -56,9 +79,8 @@ def detect_dataset(filepath: Path) -> int:
 
 
 def get_db():
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
+    conn = sqlite3.connect(str(DB_PATH), cached_statements=256)
+    tune(conn)
     return conn
 
 
@@ -102,10 +124,27 @@ def init_db(conn):
         CREATE INDEX IF NOT EXISTS idx_files_filename ON files(filename);
         CREATE INDEX IF NOT EXISTS idx_files_dataset ON files(dataset);
         CREATE INDEX IF NOT EXISTS idx_text_cache_file_id ON text_cache(file_id);
+        -- Keyword search only reads documents that have text
+        CREATE INDEX IF NOT EXISTS idx_textcache_nonempty ON text_cache(file_id) WHERE char_count > 0;
         CREATE INDEX IF NOT EXISTS idx_search_results_keyword ON search_results(keyword);
     """)
     conn.commit()
 
+    # One row per (file, keyword), so keyword search can upsert. Older DBs
+    # can't hold duplicates (every search cleared the table first), but
+    # drop any before adding the constraint.
+    if not table_exists(conn, "ux_sr_file_kw"):
+        conn.execute("""
+            DELETE FROM search_results WHERE id NOT IN (
+                SELECT MAX(id) FROM search_results GROUP BY file_id, keyword
+            )
+        """)
+        conn.execute("CREATE UNIQUE INDEX ux_sr_file_kw ON search_results(file_id, keyword)")
+        conn.commit()
+
+    init_text_fts(conn)
+    init_indexes(conn, CATALOG_INDEXES)
+
 
 def catalog(conn):
     """Scan all directories and catalog files into DB."""
@@ -302,6 +341,28 @@ except ImportError:
     DEFAULT_KEYWORDS = ["Epstein", "Maxwell", "Trump", "Clinton", "Prince Andrew"]
 
 
+def count_keyword(text, lowered, kw, pattern):
+    """(match count, first match start) of kw in text, case-insensitive.
+
+    lowered is text.lower() when text is pure ASCII, else None. For ASCII
+    text and keyword, str.count/str.find on the lowered copy give the same
+    non-overlapping matches as the IGNORECASE regex, without the regex engine.
+    """
+    if lowered is not None and kw.isascii():
+        kw_lower = kw.lower()
+        count = lowered.count(kw_lower)
+        return count, lowered.find(kw_lower) if count else -1
+    matches = list(pattern.finditer(text))
+    return len(matches), matches[0].start() if matches else -1
+
+
+def _flush_results(conn, pending):
+    """Upsert a batch of (file_id, keyword, match_count, context) rows."""
+    conn.executemany(INSERT_RESULT_SQL, pending)
+    conn.executemany("INSERT INTO temp.sr_seen (file_id, keyword) VALUES (?, ?)",
+                     [(file_id, kw) for file_id, kw, _, _ in pending])
+
+
 def run_keyword_search(conn, keywords=None):
     """Search all extracted text for keywords."""
     if keywords is None:
@@ -309,51 +370,102 @@ def run_keyword_search(conn, keywords=None):
 
     print(f"\n=== KEYWORD SEARCH ({len(keywords)} keywords) ===\n")
 
-    # Clear old results
-    conn.execute("DELETE FROM search_results")
-    conn.commit()
-
-    # Get all text
-    rows = conn.execute("""
-        SELECT f.id, f.filename, f.rel_path, tc.extracted_text
-        FROM files f
-        JOIN text_cache tc ON tc.file_id = f.id
-        WHERE tc.char_count > 0
-    """).fetchall()
+    # (file_id, keyword) pairs found by this run; anything else in
+    # search_results is stale and removed at the end
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS sr_seen (
+            file_id INTEGER, keyword TEXT, PRIMARY KEY (file_id, keyword)
+        ) WITHOUT ROWID
+    """)
 
-    print(f"  Searching {len(rows)} files with text...\n")
+    # One write transaction for the whole run: a single commit, and if the
+    # search dies partway the previous results are still there
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM temp.sr_seen")
 
     # Compile patterns
     patterns = {kw: re.compile(re.escape(kw), re.IGNORECASE) for kw in keywords}
 
+    # Narrow each keyword to the files that contain it via the trigram
+    # index (same case-insensitive substring test as the regex), so only
+    # those texts are pulled into Python. Trigrams need 3+ chars; shorter
+    # keywords still check every file.
+    candidates = defaultdict(list)
+    scan_kws = []
+    use_fts = table_exists(conn, "text_cache_fts")
+    for kw in patterns:
+        if use_fts and len(kw) >= 3:
+            for (file_id,) in conn.execute(
+                "SELECT rowid FROM text_cache_fts WHERE text_cache_fts MATCH ?", (fts_phrase(kw),)
+            ):
+                candidates[file_id].append(kw)
+        else:
+            scan_kws.append(kw)
+
+    files_searched = conn.execute("SELECT COUNT(*) FROM text_cache WHERE char_count > 0").fetchone()[0]
+
+    # Stream the texts in batches rather than holding every document in
+    # memory at once
+    if scan_kws:
+        cursor = conn.execute("""
+            SELECT tc.file_id, tc.extracted_text
+            FROM files f
+            JOIN text_cache tc ON tc.file_id = f.id
+            WHERE tc.char_count > 0
+        """)
+        to_search = files_searched
+    else:
+        cursor = conn.execute("""
+            SELECT tc.file_id, tc.extracted_text
+            FROM files f
+            JOIN text_cache tc ON tc.file_id = f.id
+            WHERE tc.char_count > 0 AND f.id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(list(candidates)),))
+        to_search = len(candidates)
+    cursor.arraysize = 128
+
+    print(f"  Searching {to_search} of {files_searched} files with text...\n")
+
     total_hits = 0
     files_with_hits = set()
     keyword_counts = defaultdict(int)
+    pending = []
+
+    rows = (row for batch in iter(cursor.fetchmany, []) for row in batch)
+    for i, (file_id, text) in enumerate(rows, 1):
+        if i % 1000 == 0:
+            print(f"  Processed {i}/{to_search} files...")
 
-    for i, (file_id, filename, rel_path, text) in enumerate(rows):
-        if (i + 1) % 1000 == 0:
-            print(f"  Processed {i+1}/{len(rows)} files...")
+        # Lowercase once per file; every keyword below scans this copy
+        lowered = text.lower() if text.isascii() else None
 
-        for kw, pattern in patterns.items():
-            matches = list(pattern.finditer(text))
-            if matches:
+        for kw in candidates.get(file_id, []) + scan_kws:
+            count, first = count_keyword(text, lowered, kw, patterns[kw])
+            if count:
                 # Get first match context
-                m = matches[0]
-                start = max(0, m.start() - 150)
-                end = min(len(text), m.end() + 150)
-                context = ' '.join(text[start:end].split())
+                start = max(0, first - 150)
+                end = min(len(text), first + len(kw) + 150)
+                context = _WS_RE.sub(' ', text[start:end]).strip()
 
-                conn.execute(
-                    "INSERT INTO search_results (file_id, keyword, match_count, context) VALUES (?, ?, ?, ?)",
-                    (file_id, kw, len(matches), context)
-                )
-                total_hits += len(matches)
+                pending.append((file_id, kw, count, context))
+                total_hits += count
                 files_with_hits.add(file_id)
-                keyword_counts[kw] += len(matches)
+                keyword_counts[kw] += count
 
-        if (i + 1) % 5000 == 0:
-            conn.commit()
+        # Write in batches: one executemany call per 500 rows
+        if len(pending) >= 500:
+            _flush_results(conn, pending)
+            pending.clear()
+
+    _flush_results(conn, pending)
 
+    # Results from earlier runs this one didn't reproduce
+    conn.execute("""
+        DELETE FROM search_results WHERE NOT EXISTS (
+            SELECT 1 FROM temp.sr_seen s
+            WHERE s.file_id = search_results.file_id AND s.keyword = search_results.keyword
+        )
+    """)
     conn.commit()
 
     # Generate report
@@ -364,7 +476,7 @@ def run_keyword_search(conn, keywords=None):
     with open(report_path, 'w') as f:
         f.write("EPSTEIN FILES KEYWORD SEARCH REPORT\n")
         f.write(f"Generated: {datetime.now().isoformat()}\n")
-        f.write(f"Files searched: {len(rows)}\n")
+        f.write(f"Files searched: {files_searched}\n")
         f.write(f"Files with hits: {len(files_with_hits)}\n")
         f.write(f"Total keyword matches: {total_hits}\n")
         f.write("=" * 70 + "\n\n")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Build search indexes for the Epstein files DB.
+
+Usage:
+    python db_index.py build      # Create FTS tables + summary tables, backfill
+    python db_index.py status     # Show index stats
+    python db_index.py compact    # Merge FTS segments, VACUUM (after big imports)
+"""
+
+import sys
+import sqlite3
+from pathlib import Path
+
+BASE_DIR = Path("./epstein_files")
+DB_PATH = BASE_DIR / "epstein.db"
+
+# Composite indexes for the app's own queries, built by migrate():
+# (name, table, columns, narrower index it replaces or None).
+#  - ix_ent_file: the shared-documents join probes entities by (file_id,
+#    normalized); also ner_extract's co-occurrence scan, which reads PERSON
+#    rows in file_id order. Supersedes idx_entities_file(file_id).
+#  - ix_cooc_pair_cnt: load_connections and build_graph_edges look up
+#    entity_cooccurrence by entity_a and need entity_b/file_count.
+# The CLI scripts keep their own lists (catalog_and_report.CATALOG_INDEXES,
+# ner_extract.NER_INDEXES) so the app doesn't build indexes it never reads.
+APP_INDEXES = [
+    ("ix_ent_file", "entities", "file_id, normalized, entity_label, count", "idx_entities_file"),
+    ("ix_cooc_pair_cnt", "entity_cooccurrence", "entity_a, entity_b, file_count", None),
+]
+
+# Graph slider bounds in app.py: every rendered node is among the top
+# GRAPH_MAX_NODES people with GRAPH_MIN_WEIGHT+ files, or a VIP
+GRAPH_MIN_WEIGHT = 2
+GRAPH_MAX_NODES = 300
+
+# Always shown in the graph (gold stars), even below the weight threshold
+VIP_NAMES = frozenset({
+    'jeffrey epstein', 'ghislaine maxwell', 'donald trump',
+    'donald j. trump', 'bill clinton', 'prince andrew',
+    'alan dershowitz', 'les wexner', 'jean-luc brunel',
+    'virginia roberts', 'virginia giuffre',
+})
+
+
+# Applied to every connection at open time. WAL + synchronous=NORMAL keeps
+# commits cheap; the rest sizes the page cache (64 MB), mmap (256 MB) and
+# keeps temp b-trees (sorts, CTEs) in memory.
+PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "cache_size=-65536",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+)
+
+
+def tune(conn):
+    """Apply PRAGMAS to a freshly opened connection."""
+    for pragma in PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+
+def get_db():
+    conn = sqlite3.connect(str(DB_PATH))
+    tune(conn)
+    return conn
+
+
+def table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone() is not None
+
+
+def fts_phrase(term):
+    """Quote a user term as a single FTS5 phrase (trigram = substring match)."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def init_text_fts(conn):
+    """Create the trigram FTS5 index over text_cache. Returns True if built."""
+    if table_exists(conn, "text_cache_fts") or not table_exists(conn, "text_cache"):
+        return False
+
+    # External-content table: the index lives in FTS, the text stays in text_cache.
+    # Trigram tokenizer keeps LIKE '%term%' semantics (substring, case-insensitive).
+    conn.executescript("""
+        CREATE VIRTUAL TABLE text_cache_fts USING fts5(
+            extracted_text,
+            content='text_cache',
+            content_rowid='file_id',
+            tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS text_cache_fts_ai AFTER INSERT ON text_cache BEGIN
+            INSERT INTO text_cache_fts(rowid, extracted_text)
+            VALUES (new.file_id, new.extracted_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS text_cache_fts_ad AFTER DELETE ON text_cache BEGIN
+            INSERT INTO text_cache_fts(text_cache_fts, rowid, extracted_text)
+            VALUES ('delete', old.file_id, old.extracted_text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS text_cache_fts_au AFTER UPDATE ON text_cache BEGIN
+            INSERT INTO text_cache_fts(text_cache_fts, rowid, extracted_text)
+            VALUES ('delete', old.file_id, old.extracted_text);
+            INSERT INTO text_cache_fts(rowid, extracted_text)
+            VALUES (new.file_id, new.extracted_text);
+        END;
+        INSERT INTO text_cache_fts(text_cache_fts) VALUES ('rebuild');
+    """)
+    conn.commit()
+    return True
+
+
+def init_indexes(conn, indexes=APP_INDEXES):
+    """Create missing composite indexes, then refresh planner stats."""
+    created = False
+    for name, table, cols, replaces in indexes:
+        if not table_exists(conn, table):
+            continue
+        if not table_exists(conn, name):
+            conn.execute(f"CREATE INDEX {name} ON {table}({cols})")
+            created = True
+        if replaces:
+            # A prefix of `name`; keeping both just slows inserts
+            conn.execute(f"DROP INDEX IF EXISTS {replaces}")
+    if created:
+        conn.execute("ANALYZE")
+    conn.commit()
+    return created
+
+
+def build_person_stats(conn):
+    """(Re)materialize per-person mention/file totals (+ name index) from entities."""
+    if not table_exists(conn, "entities"):
+        return False
+
+    # The graph, header and person search all need SUM(count) /
+    # COUNT(DISTINCT file_id) per PERSON; computing it once here saves a
+    # full GROUP BY over entities on every page render.
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS person_stats (
+            normalized TEXT PRIMARY KEY,
+            mentions INTEGER NOT NULL,
+            files INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_person_stats_files ON person_stats(files, mentions);
+        DELETE FROM person_stats;
+        INSERT INTO person_stats (normalized, mentions, files)
+            SELECT normalized, SUM(count), COUNT(DISTINCT file_id)
+            FROM entities WHERE entity_label = 'PERSON'
+            GROUP BY normalized;
+
+        -- Trigram name index for person search (substring match, like
+        -- text_cache_fts). person_stats has no rowid to point an
+        -- external-content table at, so this one keeps its own copy.
+        CREATE VIRTUAL TABLE IF NOT EXISTS person_stats_fts USING fts5(
+            normalized,
+            tokenize='trigram'
+        );
+        DELETE FROM person_stats_fts;
+        INSERT INTO person_stats_fts (normalized) SELECT normalized FROM person_stats;
+    """)
+    conn.commit()
+    return True
+
+
+def build_vip_names(conn):
+    """Store VIP_NAMES in the DB so graph queries can JOIN them. Returns True if changed."""
+    conn.execute("CREATE TABLE IF NOT EXISTS vip_names (name TEXT PRIMARY KEY) WITHOUT ROWID")
+    # The list lives in code; resync when it differs from the table
+    stored = {name for (name,) in conn.execute("SELECT name FROM vip_names")}
+    if stored == VIP_NAMES:
+        return False
+    conn.execute("DELETE FROM vip_names")
+    conn.executemany("INSERT INTO vip_names (name) VALUES (?)", [(v,) for v in sorted(VIP_NAMES)])
+    conn.commit()
+    return True
+
+
+def build_graph_edges(conn):
+    """(Re)materialize the co-occurrence edges any graph render can draw."""
+    if not (table_exists(conn, "person_stats") and table_exists(conn, "entity_cooccurrence")):
+        return False
+    build_vip_names(conn)
+
+    # A render's nodes are the top N (N <= GRAPH_MAX_NODES) people with
+    # min_weight >= GRAPH_MIN_WEIGHT files, plus VIPs; with the same
+    # (files DESC, normalized) order that's always a subset of this set.
+    # Keeping only edges between those people gives the app a small
+    # table to read instead of all of entity_cooccurrence.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS graph_edges (
+            entity_a TEXT NOT NULL,
+            entity_b TEXT NOT NULL,
+            file_count INTEGER NOT NULL,
+            PRIMARY KEY (entity_a, entity_b)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("DELETE FROM graph_edges")
+    conn.execute("""
+        WITH nodes(name) AS (
+            SELECT normalized FROM (
+                SELECT normalized FROM person_stats WHERE files >= :min_weight
+                ORDER BY files DESC, normalized LIMIT :max_nodes
+            )
+            UNION
+            SELECT name FROM vip_names
+        )
+        INSERT INTO graph_edges (entity_a, entity_b, file_count)
+            SELECT entity_a, entity_b, MAX(file_count)
+            FROM entity_cooccurrence
+            WHERE entity_a IN nodes AND entity_b IN nodes
+            GROUP BY entity_a, entity_b
+    """, {"min_weight": GRAPH_MIN_WEIGHT, "max_nodes": GRAPH_MAX_NODES})
+    conn.commit()
+    return True
+
+
+def migrate(conn):
+    """Create anything the app needs that's missing. Returns names built."""
+    built = []
+    if init_text_fts(conn):
+        built.append("text_cache_fts")
+    stats_built = not table_exists(conn, "person_stats_fts") and build_person_stats(conn)
+    if stats_built:
+        built.append("person_stats")
+    vips_changed = build_vip_names(conn)
+    if vips_changed:
+        built.append("vip_names")
+    if ((stats_built or vips_changed or not table_exists(conn, "graph_edges"))
+            and build_graph_edges(conn)):
+        built.append("graph_edges")
+    if init_indexes(conn):
+        built.append("app indexes")
+    return built
+
+
+def build(conn):
+    """Create any missing indexes."""
+    print("\n=== BUILDING INDEXES ===\n")
+    built = migrate(conn)
+    for name in built:
+        print(f"  {name}: built")
+    if not built:
+        print("  Everything already exists (text_cache_fts is kept in sync by triggers).")
+
+
+def compact(conn):
+    """Merge FTS segments and VACUUM so scans read fewer, contiguous pages."""
+    print("\n=== COMPACTING ===\n")
+    before = DB_PATH.stat().st_size
+    if table_exists(conn, "text_cache_fts"):
+        # Trigger-fed inserts leave many small b-tree segments; merge to one
+        conn.execute("INSERT INTO text_cache_fts(text_cache_fts) VALUES ('optimize')")
+        conn.commit()
+        print("  text_cache_fts: segments merged")
+    conn.execute("PRAGMA optimize")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    after = DB_PATH.stat().st_size
+    print(f"  {before / 1e6:,.1f} MB -> {after / 1e6:,.1f} MB")
+
+
+def show_status(conn):
+    """Show index stats."""
+    print("\n=== INDEX STATUS ===\n")
+    if table_exists(conn, "text_cache_fts"):
+        docs = conn.execute("SELECT COUNT(*) FROM text_cache_fts").fetchone()[0]
+        print(f"  text_cache_fts: {docs:,} documents")
+    else:
+        print("  text_cache_fts: missing (run: python db_index.py build)")
+    if table_exists(conn, "person_stats"):
+        people = conn.execute("SELECT COUNT(*) FROM person_stats").fetchone()[0]
+        print(f"  person_stats: {people:,} people")
+        if not table_exists(conn, "person_stats_fts"):
+            print("  person_stats_fts: missing (run: python db_index.py build)")
+    else:
+        print("  person_stats: missing (run: python db_index.py build)")
+    if table_exists(conn, "graph_edges"):
+        edges = conn.execute("SELECT COUNT(*) FROM graph_edges").fetchone()[0]
+        print(f"  graph_edges: {edges:,} edges")
+    else:
+        print("  graph_edges: missing (run: python db_index.py build)")
+    if table_exists(conn, "vip_names"):
+        vips = conn.execute("SELECT COUNT(*) FROM vip_names").fetchone()[0]
+        print(f"  vip_names: {vips:,} names")
+    else:
+        print("  vip_names: missing (run: python db_index.py build)")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    conn = get_db()
+    command = sys.argv[1].lower()
+
+    if command == "build":
+        build(conn)
+    elif command == "status":
+        show_status(conn)
+    elif command == "compact":
+        compact(conn)
+    else:
+        print(f"Unknown command: {command}")
+        print(__doc__)
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
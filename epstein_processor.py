@@ -53,6 +53,9 @@ EXTRACT_DIR = BASE_DIR / "extracted"
 OUTPUT_DIR = BASE_DIR / "output"
 TEXT_CACHE_DIR = BASE_DIR / "text_cache"
 
+# Runs of whitespace, collapsed to one space in match contexts
+_WS_RE = re.compile(r'\s+')
+
 # Default search keywords
 DEFAULT_KEYWORDS = [
     # === POLITICIANS / PUBLIC FIGURES ===
@@ -356,10 +359,14 @@ def extract_text_from_pdf(pdf_path: Path) -> str:
     return text
 
 
-def search_text(text: str, keyword: str, context_chars: int = 200) -> list:
-    """Search for keyword in text, return matches with context."""
+def search_text(text: str, keyword: str, context_chars: int = 200, pattern=None) -> list:
+    """Search for keyword in text, return matches with context.
+
+    Callers looping over many files can pass the keyword's compiled pattern.
+    """
     matches = []
-    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
+    if pattern is None:
+        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
     
     for match in pattern.finditer(text):
         start = max(0, match.start() - context_chars)
@@ -369,7 +376,7 @@ def search_text(text: str, keyword: str, context_chars: int = 200) -> list:
         context = text[start:end]
         
         # Clean up context (remove excessive whitespace)
-        context = ' '.join(context.split())
+        context = _WS_RE.sub(' ', context).strip()
         
         # Highlight the match
         highlighted = pattern.sub(f"**{match.group()}**", context)
@@ -398,6 +405,7 @@ def search_files(keyword: str, max_workers: int = 4):
     
     results = []
     processed = 0
+    pattern = re.compile(re.escape(keyword), re.IGNORECASE)
     
     for pdf_path in pdf_files:
         processed += 1
@@ -409,7 +417,7 @@ def search_files(keyword: str, max_workers: int = 4):
             if not text:
                 continue
             
-            matches = search_text(text, keyword)
+            matches = search_text(text, keyword, pattern=pattern)
             if matches:
                 results.append({
                     'file': str(pdf_path.relative_to(EXTRACT_DIR)),
@@ -481,7 +489,7 @@ def generate_report(keywords: list = None):
             rel_path = str(pdf_path.relative_to(EXTRACT_DIR))
 
             for kw, pattern in patterns.items():
-                matches = search_text(text, kw)
+                matches = search_text(text, kw, pattern=pattern)
                 if matches:
                     all_results[kw].append({
                         'file': rel_path,
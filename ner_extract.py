@@ -17,15 +17,24 @@ from itertools import combinations
 
 import spacy
 
+from db_index import build_person_stats, build_graph_edges, init_indexes, tune, APP_INDEXES
+
 BASE_DIR = Path("./epstein_files")
 DB_PATH = BASE_DIR / "epstein.db"
 OUTPUT_DIR = BASE_DIR / "output"
 
+# Composite indexes for this script's queries (see db_index.init_indexes):
+# build_person_stats and status total PERSON/ORG rows by name, and status
+# and generate_graph read the strongest pairs first.
+NER_INDEXES = [
+    ("ix_ent_label_norm", "entities", "entity_label, normalized, file_id, count", "idx_entities_label"),
+    ("idx_cooc_weight", "entity_cooccurrence", "file_count DESC", None),
+]
+
 
 def get_db():
     conn = sqlite3.connect(str(DB_PATH))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
+    tune(conn)
     return conn
 
 
@@ -47,13 +56,14 @@ def init_tables(conn):
             label_a TEXT,
             label_b TEXT
         );
-        CREATE INDEX IF NOT EXISTS idx_entities_file ON entities(file_id);
         CREATE INDEX IF NOT EXISTS idx_entities_normalized ON entities(normalized);
-        CREATE INDEX IF NOT EXISTS idx_entities_label ON entities(entity_label);
         CREATE INDEX IF NOT EXISTS idx_cooccur_a ON entity_cooccurrence(entity_a);
         CREATE INDEX IF NOT EXISTS idx_cooccur_b ON entity_cooccurrence(entity_b);
     """)
     conn.commit()
+    # ix_ent_file (an APP_INDEXES entry) replaces idx_entities_file and
+    # serves the co-occurrence scan, so build it here too
+    init_indexes(conn, APP_INDEXES + NER_INDEXES)
 
 
 def normalize_entity(text):
@@ -307,9 +317,13 @@ def main():
     if command == "extract":
         extract_entities(conn)
         build_cooccurrence(conn)
+        build_person_stats(conn)
+        build_graph_edges(conn)
     elif command == "cooccur":
         min_docs = int(sys.argv[2]) if len(sys.argv) > 2 else 2
         build_cooccurrence(conn, min_docs=min_docs)
+        build_person_stats(conn)
+        build_graph_edges(conn)
     elif command == "status":
         show_status(conn)
     elif command == "graph":